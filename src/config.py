@@ -15,10 +15,12 @@ STATE_FILE_PATH = PROJECT_ROOT / "data" / "state.json"
 
 # X API投稿制限
 MONTHLY_TWEET_LIMIT = 450  # Free枠500の90%を安全マージンとして設定
+STATUS_CHANGE_USAGE_LIMIT = 0.90  # この使用率以上ではステータス変更を通知しない
 
 # リトライ設定
-MAX_RETRIES = 3
-BACKOFF_FACTOR = 2  # 指数バックオフの係数
+MAX_RETRIES = 3  # 1回の取得での最大試行回数（初回を含む）
+BACKOFF_FACTOR = 2  # 指数バックオフの係数（urllib3 Retry の backoff_factor）
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)  # リトライ対象のHTTPステータス
 
 # タイムアウト設定（秒）
 REQUEST_TIMEOUT = 30
@@ -1,12 +1,15 @@
 """メイン処理モジュール"""
 
+import argparse
 import logging
 import sys
+from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
 
 from .config import LOG_LEVEL, STATE_FILE_PATH
-from .notifier import XNotifier, can_send_notification, should_notify_change
+from .notifier import XNotifier, can_send_notification, select_notifications
 from .scraper import ToshimaScraper
 from .state_manager import StateManager
 
@@ -22,12 +25,64 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main() -> int:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """コマンドライン引数を解析
+
+    Args:
+        argv: 引数リスト（None の場合は sys.argv を使用）
+
+    Returns:
+        解析結果
+    """
+    parser = argparse.ArgumentParser(description="としまテレビ障害情報チェック")
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="状態ファイルをインデント付きで表示して終了する",
+    )
+    return parser.parse_args(argv)
+
+
+def print_state_pretty(state_file: Path) -> int:
+    """状態ファイルをインデント付きで標準出力に表示
+
+    状態ファイルはコンパクト形式で保存しているため、確認用に整形して表示する。
+    StateManager は読み込みに失敗すると初期状態で代用するため使わず、
+    ファイルを直接パースする（標準出力にはJSONだけを出力する）
+
+    Args:
+        state_file: 状態ファイルのパス
+
+    Returns:
+        終了コード（0: 成功、1: 状態ファイルがないか読み込めない）
+    """
+    if not state_file.exists():
+        print(f"状態ファイルが見つかりません: {state_file}", file=sys.stderr)
+        return 1
+
+    try:
+        state = orjson.loads(state_file.read_bytes())
+    except (OSError, orjson.JSONDecodeError) as e:
+        print(f"状態ファイルを読み込めません: {state_file} ({e})", file=sys.stderr)
+        return 1
+
+    print(orjson.dumps(state, option=orjson.OPT_INDENT_2).decode())
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
     """メイン処理
 
+    Args:
+        argv: コマンドライン引数（None の場合は sys.argv を使用）
+
     Returns:
         終了コード（0: 成功、1: エラー）
     """
+    args = parse_args(argv)
+    if args.pretty:
+        return print_state_pretty(STATE_FILE_PATH)
+
     logger.info("としまテレビ障害情報チェックを開始します")
 
     try:
@@ -37,14 +92,14 @@ def main() -> int:
 
         # 2. 障害情報をスクレイピング
         logger.info("障害情報を取得しています...")
-        scraper = ToshimaScraper()
+        scraper = ToshimaScraper(http_cache=state_manager.get_http_cache())
         outages = scraper.fetch_outage_list(max_pages=1)
 
         if not outages:
             logger.warning("障害情報を取得できませんでした")
             return 1
 
-        logger.info(f"{len(outages)} 件の障害情報を取得しました")
+        logger.info("%s 件の障害情報を取得しました", len(outages))
 
         # 3. 差分検出
         logger.info("差分を検出しています...")
@@ -56,52 +111,55 @@ def main() -> int:
             return 0
 
         logger.info(
-            f"変更を検出: 新規障害 {len(changes.new_outages)} 件、"
-            f"ステータス変更 {len(changes.status_changes)} 件"
+            "変更を検出: 新規障害 %s 件、ステータス変更 %s 件",
+            len(changes.new_outages),
+            len(changes.status_changes),
         )
 
-        # 4. 投稿制限チェック
-        if not can_send_notification(state_manager):
-            logger.warning("月間投稿制限のため通知をスキップします")
-            state_manager.update_outages(outages)
-            state_manager.save_state()
-            return 0
+        # 4〜6の状態変更は終了時に1回だけ保存する
+        with state_manager.transaction():
+            # 4. 投稿制限チェック
+            if not can_send_notification(state_manager):
+                logger.warning("月間投稿制限のため通知をスキップします")
+                state_manager.update_outages(outages)
+                return 0
+
+            # 5. 通知送信
+            logger.info("通知を送信しています...")
+            notifier = XNotifier()
+            notification_sent = False
 
-        # 5. 通知送信
-        logger.info("通知を送信しています...")
-        notifier = XNotifier()
-        notification_sent = False
+            # 通知対象は投稿数に応じて送信前にまとめて決める
+            new_to_send, status_to_send = select_notifications(state_manager, changes)
 
-        # 新規障害の通知
-        for outage in changes.new_outages:
-            if should_notify_change(state_manager, "new"):
-                if notifier.notify_new_outage(outage):
+            # 新規障害の通知
+            results = notifier.notify_new_outages(new_to_send)
+
+            for outage, success in zip(new_to_send, results, strict=True):
+                if success:
                     state_manager.mark_notified(outage.id, outage.status)
                     state_manager.increment_notification_count()
                     notification_sent = True
-                    logger.info(f"新規障害を通知しました: {outage.title}")
+                    logger.info("新規障害を通知しました: %s", outage.title)
+
+            # ステータス変更の通知
+            results = notifier.notify_status_changes(status_to_send)
 
-        # ステータス変更の通知
-        for change in changes.status_changes:
-            if should_notify_change(state_manager, "status_change"):
-                if notifier.notify_status_change(change):
+            for change, success in zip(status_to_send, results, strict=True):
+                if success:
                     state_manager.mark_notified(change.outage.id, change.new_status)
                     state_manager.increment_notification_count()
                     notification_sent = True
                     logger.info(
-                        f"ステータス変更を通知しました: {change.outage.title} "
-                        f"({change.old_status or '進行中'} -> {change.new_status or '進行中'})"
+                        "ステータス変更を通知しました: %s (%s -> %s)",
+                        change.outage.title,
+                        change.old_status or "進行中",
+                        change.new_status or "進行中",
                     )
 
-        # 6. 状態保存
-        logger.info("状態を保存しています...")
-        state_manager.update_outages(outages)
-        saved = state_manager.save_state()
-
-        if saved:
-            logger.info("状態ファイルを保存しました")
-        else:
-            logger.info("状態に変更がないため保存をスキップしました")
+            # 6. 状態更新（保存はトランザクション終了時に行う）
+            logger.info("状態を更新しています...")
+            state_manager.update_outages(outages)
 
         if notification_sent:
             logger.info("通知処理が完了しました")
@@ -111,7 +169,7 @@ def main() -> int:
         return 0
 
     except Exception as e:
-        logger.exception(f"予期しないエラーが発生しました: {e}")
+        logger.exception("予期しないエラーが発生しました: %s", e)
         return 1
 
 
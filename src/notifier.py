@@ -7,11 +7,12 @@ import tweepy
 from .config import (
     DRY_RUN,
     MONTHLY_TWEET_LIMIT,
+    STATUS_CHANGE_USAGE_LIMIT,
     get_x_credentials,
     validate_x_credentials,
 )
 from .scraper import OutageInfo
-from .state_manager import StateManager, StatusChange
+from .state_manager import ChangeResult, StateManager, StatusChange
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +52,7 @@ class XNotifier:
             return client
 
         except Exception as e:
-            logger.error(f"X APIクライアントの初期化に失敗: {e}")
+            logger.error("X APIクライアントの初期化に失敗: %s", e)
             return None
 
     def notify_new_outage(self, outage: OutageInfo) -> bool:
@@ -78,6 +79,30 @@ class XNotifier:
         message = self._format_status_change_message(change)
         return self._post_tweet(message)
 
+    def notify_new_outages(self, outages: list[OutageInfo]) -> list[bool]:
+        """複数の新規障害をまとめて通知
+
+        Args:
+            outages: 障害情報のリスト
+
+        Returns:
+            各障害の投稿結果（引数と同じ順序）
+        """
+        messages = [self._format_new_outage_message(outage) for outage in outages]
+        return self._post_tweets(messages)
+
+    def notify_status_changes(self, changes: list[StatusChange]) -> list[bool]:
+        """複数のステータス変更をまとめて通知
+
+        Args:
+            changes: ステータス変更情報のリスト
+
+        Returns:
+            各変更の投稿結果（引数と同じ順序）
+        """
+        messages = [self._format_status_change_message(change) for change in changes]
+        return self._post_tweets(messages)
+
     def _format_new_outage_message(self, outage: OutageInfo) -> str:
         """新規障害用メッセージをフォーマット
 
@@ -87,21 +112,12 @@ class XNotifier:
         Returns:
             フォーマットされたメッセージ
         """
-        lines = [
+        return self._build_message(
             "【としまテレビ 障害情報】",
             outage.title,
-        ]
-
-        if outage.date:
-            lines.append(f"日時: {outage.date}")
-
-        if outage.area:
-            lines.append(f"地域: {outage.area}")
-
-        lines.append(f"詳細: {outage.url}")
-
-        message = "\n".join(lines)
-        return self._truncate_message(message)
+            (("日時", outage.date), ("地域", outage.area)),
+            outage.url,
+        )
 
     def _format_status_change_message(self, change: StatusChange) -> str:
         """ステータス変更用メッセージをフォーマット
@@ -123,18 +139,33 @@ class XNotifier:
             header = "【としまテレビ 障害情報更新】"
             status_text = f"{outage.title}（{new_status}）"
 
-        lines = [
-            header,
-            status_text,
-        ]
+        return self._build_message(
+            header, status_text, (("地域", outage.area),), outage.url
+        )
+
+    def _build_message(
+        self,
+        header: str,
+        first_line: str,
+        fields: tuple[tuple[str, str], ...],
+        url: str,
+    ) -> str:
+        """ヘッダー・本文・項目・詳細URLからメッセージを組み立て
 
-        if outage.area:
-            lines.append(f"地域: {outage.area}")
+        Args:
+            header: 1行目のヘッダー
+            first_line: 2行目の本文
+            fields: (ラベル, 値) のタプル。値が空の項目は出力しない
+            url: 詳細ページURL
 
-        lines.append(f"詳細: {outage.url}")
+        Returns:
+            最大文字数に収めたメッセージ
+        """
+        lines = [header, first_line]
+        lines.extend(f"{label}: {value}" for label, value in fields if value)
+        lines.append(f"詳細: {url}")
 
-        message = "\n".join(lines)
-        return self._truncate_message(message)
+        return self._truncate_message("\n".join(lines))
 
     def _truncate_message(self, message: str) -> str:
         """メッセージを最大文字数に切り詰め
@@ -151,10 +182,24 @@ class XNotifier:
         # URLを保持しつつ切り詰め
         truncated = message[: self.MAX_TWEET_LENGTH - 3] + "..."
         logger.warning(
-            f"メッセージを切り詰めました: {len(message)} -> {len(truncated)}文字"
+            "メッセージを切り詰めました: %s -> %s文字", len(message), len(truncated)
         )
         return truncated
 
+    def _post_tweets(self, messages: list[str]) -> list[bool]:
+        """複数のツイートを順番に投稿
+
+        タイムラインを障害の順序どおりに並べるため、1件ずつ順に送信する。
+        1回の実行で投稿するのは数件なので並行化はしない
+
+        Args:
+            messages: 投稿するメッセージのリスト
+
+        Returns:
+            各メッセージの投稿結果（引数と同じ順序）
+        """
+        return [self._post_tweet(message) for message in messages]
+
     def _post_tweet(self, message: str) -> bool:
         """ツイートを投稿
 
@@ -165,7 +210,7 @@ class XNotifier:
             投稿成功時True
         """
         if DRY_RUN:
-            logger.info(f"[DRY RUN] ツイートをスキップ:\n{message}")
+            logger.info("[DRY RUN] ツイートをスキップ:\n%s", message)
             return True
 
         if self.client is None:
@@ -175,11 +220,16 @@ class XNotifier:
         try:
             response = self.client.create_tweet(text=message)
             tweet_id = response.data.get("id") if response.data else "unknown"
-            logger.info(f"ツイートを投稿しました: ID={tweet_id}")
+            logger.info("ツイートを投稿しました: ID=%s", tweet_id)
             return True
 
         except tweepy.TweepyException as e:
-            logger.error(f"ツイート投稿に失敗: {e}")
+            logger.error("ツイート投稿に失敗: %s", e)
+            return False
+
+        except Exception:
+            # 1件の想定外のエラーで投稿済み分の結果まで失わないよう失敗として扱う
+            logger.exception("ツイート投稿中に予期しないエラーが発生しました")
             return False
 
 
@@ -192,40 +242,42 @@ def can_send_notification(state_manager: StateManager) -> bool:
     Returns:
         送信可能ならTrue
     """
-    count = state_manager.get_notification_count_this_month()
+    remaining = state_manager.get_remaining_quota()
 
-    if count >= MONTHLY_TWEET_LIMIT:
-        logger.warning(f"月間投稿制限に達しました: {count}/{MONTHLY_TWEET_LIMIT}")
+    if remaining == 0:
+        count = state_manager.get_notification_count_this_month()
+        logger.warning("月間投稿制限に達しました: %s/%s", count, MONTHLY_TWEET_LIMIT)
         return False
 
-    remaining = MONTHLY_TWEET_LIMIT - count
-    logger.debug(f"今月の残り投稿可能数: {remaining}")
+    logger.debug("今月の残り投稿可能数: %s", remaining)
     return True
 
 
-def should_notify_change(
+def select_notifications(
     state_manager: StateManager,
-    change_type: str,
-) -> bool:
-    """変更を通知すべきかどうか判定
+    changes: ChangeResult,
+) -> tuple[list[OutageInfo], list[StatusChange]]:
+    """今月の投稿数に応じて通知対象を選ぶ
 
-    制限に近づいている場合は重要な通知のみに絞る
+    制限に近づいている場合は重要な通知（新規障害）のみに絞る。
+    送信前に一度だけ判定し、新規障害を全件送信した後の投稿数で
+    ステータス変更の通知可否を決める
 
     Args:
         state_manager: 状態管理オブジェクト
-        change_type: 変更タイプ（"new" または "status_change"）
+        changes: 差分検出結果
 
     Returns:
-        通知すべきならTrue
+        (通知する新規障害, 通知するステータス変更) のタプル
     """
     count = state_manager.get_notification_count_this_month()
 
-    # 96%以上使用: 新規障害のみ
-    if count >= int(MONTHLY_TWEET_LIMIT * 0.96):
-        return change_type == "new"
+    # 新規障害: 残り投稿可能数まで
+    new_outages = changes.new_outages[: state_manager.get_remaining_quota()]
 
-    # 90%以上使用: 新規障害と重要なステータス変更
-    if count >= int(MONTHLY_TWEET_LIMIT * 0.90):
-        return change_type in ["new"]
+    # ステータス変更: 使用率が閾値（90%）に達するまで
+    status_limit = int(MONTHLY_TWEET_LIMIT * STATUS_CHANGE_USAGE_LIMIT)
+    status_budget = max(0, status_limit - count - len(new_outages))
+    status_changes = changes.status_changes[:status_budget]
 
-    return True
+    return new_outages, status_changes
@@ -1,26 +1,58 @@
 """障害情報スクレイピングモジュール"""
 
+import codecs
+import hashlib
 import logging
 import re
-import time
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from urllib3.util.retry import Retry
 
 from .config import (
     BACKOFF_FACTOR,
     MAX_RETRIES,
     REQUEST_TIMEOUT,
+    RETRY_STATUS_CODES,
     TOSHIMA_BASE_URL,
     TOSHIMA_TROUBLE_URL,
 )
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# エントリー解析用の正規表現（パースのたびにコンパイルしないよう事前に用意）
+_RE_DETAIL_ID = re.compile(r"/trouble/detail/(\d+)")
+
+# リンクテキストの例: "2025.12.09（終了）緊急メンテナンス（池袋本町1丁目付近）"
+# 日付はテキスト中の最初の日付、ステータスは最初の括弧内とする
+# 地域情報（丁目、付近など）を含む括弧はステータスとして扱わない
+_RE_DATE = re.compile(r"\d{4}\.\d{2}\.\d{2}")
+_RE_BRACKET = re.compile(r"[（(]([^）)]+)[）)]")
+_RE_AREA_WORD = re.compile(r"丁目|付近|地区|町|番地")
+_RE_AREA = re.compile(r"[（(]([^）)]*(?:丁目|付近|地区|町|番地)[^）)]*)[）)]")
+
+# キャッシュしたパース結果を作ったパーサーの版。正規表現が変われば自動的に変わり、
+# それ以外の解析処理を変えた場合は _PARSER_REVISION を上げて古いキャッシュを捨てる
+_PARSER_REVISION = 1
+_PARSER_VERSION = hashlib.sha256(
+    "\n".join(
+        [
+            str(_PARSER_REVISION),
+            _RE_DETAIL_ID.pattern,
+            _RE_DATE.pattern,
+            _RE_BRACKET.pattern,
+            _RE_AREA_WORD.pattern,
+            _RE_AREA.pattern,
+        ]
+    ).encode()
+).hexdigest()[:16]
+
+
+@dataclass(slots=True, frozen=True)
 class OutageInfo:
     """障害情報データクラス"""
 
@@ -36,12 +68,39 @@ class OutageInfo:
 class ToshimaScraper:
     """としまテレビ障害情報スクレイパー"""
 
-    def __init__(self):
+    MAX_CONCURRENT_PAGES = 8  # 同時に取得するページの最大数（接続プールの上限）
+
+    def __init__(self, http_cache: dict | None = None):
+        """初期化
+
+        Args:
+            http_cache: 条件付きGET用のキャッシュ（URLごとのETag/Last-Modifiedと
+                パース結果）。StateManager.get_http_cache() の戻り値を渡すと
+                実行をまたいで再利用できる
+        """
+        self.http_cache = http_cache if http_cache is not None else {}
         self.session = requests.Session()
         self.session.headers.update(
             {"User-Agent": "ToshimaTVOutageNotifier/1.0 (GitHub Actions Bot)"}
         )
 
+        # リトライ（指数バックオフ・Retry-After対応）と接続の再利用はurllib3に任せる
+        # total は初回を除いた再試行回数なので、試行回数が MAX_RETRIES になるよう1引く。
+        # 待ち時間はurllib3の方式（初回の再試行は待たず、以降は係数×2^(n-1)秒）
+        retry = Retry(
+            total=MAX_RETRIES - 1,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.MAX_CONCURRENT_PAGES,
+            max_retries=retry,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
     def fetch_outage_list(self, max_pages: int = 1) -> list[OutageInfo]:
         """障害情報一覧を取得
 
@@ -51,116 +110,278 @@ class ToshimaScraper:
         Returns:
             障害情報のリスト
         """
-        all_outages = []
+        urls = [self._build_page_url(page) for page in range(1, max_pages + 1)]
+        if not urls:
+            return []
 
-        for page in range(1, max_pages + 1):
-            url = (
-                TOSHIMA_TROUBLE_URL
-                if page == 1
-                else f"{TOSHIMA_TROUBLE_URL}page/{page}/"
-            )
+        # 処理時間の大半はネットワーク待ちのため、全ページを並行して取得する。
+        # 空ページや取得失敗のページがあってもそれ以降のページは取得済みとなり、
+        # 下のループで捨てられる（通常は max_pages=1 のため無駄は生じない）
+        max_workers = min(len(urls), self.MAX_CONCURRENT_PAGES)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._fetch_page, urls))
 
-            html = self._fetch_with_retry(url)
-            if html is None:
-                logger.warning(f"ページ {page} の取得に失敗しました")
+        all_outages = []
+
+        for page, outages in enumerate(results, start=1):
+            if outages is None:
+                logger.warning("ページ %s の取得に失敗しました", page)
                 break
 
-            outages = self._parse_list_page(html)
             if not outages:
-                logger.info(f"ページ {page} に障害情報がありませんでした")
+                logger.info("ページ %s に障害情報がありませんでした", page)
                 break
 
             all_outages.extend(outages)
-            logger.info(f"ページ {page} から {len(outages)} 件の障害情報を取得")
+            logger.info("ページ %s から %s 件の障害情報を取得", page, len(outages))
 
         return all_outages
 
-    def _fetch_with_retry(self, url: str) -> str | None:
-        """リトライ付きでページを取得
+    def _build_page_url(self, page: int) -> str:
+        """一覧ページのURLを構築
+
+        Args:
+            page: ページ番号（1始まり）
+
+        Returns:
+            ページのURL
+        """
+        if page == 1:
+            return TOSHIMA_TROUBLE_URL
+        return f"{TOSHIMA_TROUBLE_URL}page/{page}/"
+
+    def _fetch_page(self, url: str) -> list[OutageInfo] | None:
+        """一覧ページを取得してパース
+
+        前回取得時のETag/Last-Modifiedで条件付きGETを行い、
+        304 Not Modified の場合はキャッシュ済みのパース結果を返す。
+        ETagに対応しないサーバー向けに、本文のハッシュが前回と同じ場合も
+        パースを省略してキャッシュを返す
 
         Args:
             url: 取得するURL
 
         Returns:
-            HTMLコンテンツ、失敗時はNone
+            障害情報のリスト、取得失敗時はNone
         """
-        for attempt in range(MAX_RETRIES):
-            try:
-                response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-                response.raise_for_status()
-                response.encoding = response.apparent_encoding
-                return response.text
-
-            except requests.RequestException as e:
-                if attempt == MAX_RETRIES - 1:
-                    logger.error(f"URL取得失敗 (最終試行): {url} - {e}")
-                    return None
-
-                wait_time = BACKOFF_FACTOR**attempt
-                logger.warning(
-                    f"リトライ {attempt + 1}/{MAX_RETRIES}: {url} - {wait_time}秒後に再試行"
+        cached = self._get_valid_cache(url)
+        response = self._fetch_with_retry(
+            url, headers=self._build_conditional_headers(cached)
+        )
+        if response is None:
+            return None
+
+        if response.status_code == 304:
+            outages = self._restore_cached_outages(url, cached)
+            if outages is not None:
+                logger.info("ページに変更がないためキャッシュを使用します: %s", url)
+                return outages
+
+            # キャッシュを復元できない場合は条件なしで本文を取得し直す
+            cached = None
+            response = self._fetch_with_retry(url)
+            if response is None:
+                return None
+
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        outages = None
+        if cached and cached.get("body_hash") == body_hash:
+            outages = self._restore_cached_outages(url, cached)
+            if outages is not None:
+                logger.info(
+                    "ページ本文が前回と同一のためキャッシュを使用します: %s", url
                 )
-                time.sleep(wait_time)
+        if outages is None:
+            outages = self._parse_list_page(self._get_html(response))
+
+        self._update_http_cache(url, response, body_hash, outages)
+        return outages
+
+    def _get_valid_cache(self, url: str) -> dict | None:
+        """現在のパーサーで作られたキャッシュエントリーを取得
+
+        Args:
+            url: 対象のURL
+
+        Returns:
+            キャッシュエントリー、ないかパーサーの版が異なる場合はNone
+        """
+        cached = self.http_cache.get(url)
+        if cached and cached.get("parser_version") != _PARSER_VERSION:
+            logger.info("パーサーが更新されたためキャッシュを使用しません: %s", url)
+            return None
+        return cached
+
+    def _restore_cached_outages(
+        self, url: str, cached: dict | None
+    ) -> list[OutageInfo] | None:
+        """キャッシュ済みのパース結果から障害情報を復元
+
+        Args:
+            url: 対象のURL
+            cached: キャッシュエントリー
+
+        Returns:
+            障害情報のリスト、復元できない場合はNone
+        """
+        if not cached:
+            return None
+        try:
+            return [OutageInfo(**outage) for outage in cached["outages"]]
+        except (KeyError, TypeError) as e:
+            logger.warning(
+                "キャッシュを復元できないため再パースします: %s (%s)", url, e
+            )
+            return None
+
+    def _build_conditional_headers(self, cached: dict | None) -> dict[str, str]:
+        """条件付きGET用のリクエストヘッダーを構築
+
+        Args:
+            cached: URLに対応するキャッシュエントリー
+
+        Returns:
+            If-None-Match / If-Modified-Since ヘッダー（キャッシュがなければ空）
+        """
+        if not cached or "outages" not in cached:
+            return {}
+
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def _update_http_cache(
+        self,
+        url: str,
+        response: requests.Response,
+        body_hash: str,
+        outages: list[OutageInfo],
+    ) -> None:
+        """レスポンスヘッダー・本文ハッシュ・パース結果でキャッシュを更新
+
+        Args:
+            url: 取得したURL
+            response: 200レスポンス
+            body_hash: 本文のSHA-256ハッシュ
+            outages: パース結果
+        """
+        self.http_cache[url] = {
+            "parser_version": _PARSER_VERSION,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body_hash": body_hash,
+            "outages": [asdict(outage) for outage in outages],
+        }
+
+    def _fetch_with_retry(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> requests.Response | None:
+        """リトライ付きでページを取得
+
+        リトライはセッションにマウントしたHTTPAdapterが行う
+
+        Args:
+            url: 取得するURL
+            headers: 追加のリクエストヘッダー
+
+        Returns:
+            レスポンス（304を含む）、失敗時はNone
+        """
+        try:
+            response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error("URL取得失敗: %s - %s", url, e)
+            return None
 
-        return None
+        # apparent_encodingは本文全体を走査して推定するため使わない
+        # charset未指定時はrequestsがISO-8859-1とみなすのでUTF-8を指定
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        return response
 
-    def _parse_list_page(self, html: str) -> list[OutageInfo]:
+    def _get_html(self, response: requests.Response) -> str | bytes:
+        """パーサーに渡すHTMLを取得
+
+        パーサー（lexbor）はバイト列をUTF-8として解釈するため、UTF-8の場合は
+        本文全体のデコードを省いてバイト列のまま渡す
+
+        Args:
+            response: 200レスポンス
+
+        Returns:
+            UTF-8ならバイト列、それ以外はデコード済みの文字列
+        """
+        encoding = response.encoding or "utf-8"
+        try:
+            is_utf8 = codecs.lookup(encoding).name == "utf-8"
+        except LookupError:
+            # 不明なcharsetはrequestsのデコード（置換文字でのフォールバック）に任せる
+            logger.warning("不明な文字コードが指定されています: %s", encoding)
+            return response.text
+        if is_utf8:
+            return response.content
+        return response.text
+
+    def _parse_list_page(self, html: str | bytes) -> list[OutageInfo]:
         """一覧ページのHTMLをパース
 
         Args:
-            html: HTMLコンテンツ
+            html: HTMLコンテンツ（バイト列の場合はUTF-8）
 
         Returns:
             障害情報のリスト
         """
-        soup = BeautifulSoup(html, "html.parser")
+        tree = LexborHTMLParser(html)
         outages = []
+        # 取得時刻はページ単位で1回だけ求め、全エントリーで共有する
+        last_updated = datetime.now(UTC).isoformat()
 
         # 障害詳細へのリンクを含む要素を探す
         # パターン: /trouble/detail/{ID} または /trouble/detail/{ID}/
-        links = soup.find_all("a", href=re.compile(r"/trouble/detail/\d+"))
+        links = tree.css('a[href*="/trouble/detail/"]')
 
         for link in links:
             try:
-                outage = self._parse_outage_entry(link)
+                outage = self._parse_outage_entry(link, last_updated)
                 if outage:
                     outages.append(outage)
             except Exception as e:
-                logger.warning(f"障害エントリーのパースに失敗: {e}")
+                logger.warning("障害エントリーのパースに失敗: %s", e)
                 continue
 
         return outages
 
-    def _parse_outage_entry(self, link_element) -> OutageInfo | None:
+    def _parse_outage_entry(
+        self, link_element: LexborNode, last_updated: str
+    ) -> OutageInfo | None:
         """個別の障害エントリーをパース
 
         Args:
-            link_element: BeautifulSoupのリンク要素
+            link_element: selectolaxのリンク要素
+            last_updated: 取得時刻（ISO 8601形式）
 
         Returns:
             OutageInfo、パース失敗時はNone
         """
-        href = link_element.get("href", "")
-        text = link_element.get_text(strip=True)
+        href = link_element.attributes.get("href") or ""
+        text = link_element.text(strip=True)
 
         if not href or not text:
             return None
 
         # IDを抽出
-        id_match = re.search(r"/trouble/detail/(\d+)", href)
+        id_match = _RE_DETAIL_ID.search(href)
         if not id_match:
             return None
         outage_id = id_match.group(1)
 
-        # 日付を抽出（YYYY.MM.DD形式）
-        date_match = re.search(r"(\d{4}\.\d{2}\.\d{2})", text)
-        date = date_match.group(1) if date_match else ""
-
-        # ステータスを抽出（最初の括弧内テキスト）
-        status = self._extract_status(text)
-
-        # タイトルと地域を抽出
-        title, area = self._extract_title_and_area(text, date, status)
+        # 日付・ステータス・タイトル・地域を抽出
+        date, status, rest = self._split_entry_text(text)
+        title, area = self._extract_title_and_area(rest)
 
         # 完全なURLを構築
         full_url = f"{TOSHIMA_BASE_URL}{href}" if href.startswith("/") else href
@@ -172,67 +393,51 @@ class ToshimaScraper:
             title=title,
             area=area,
             url=full_url,
+            last_updated=last_updated,
         )
 
-    def _extract_status(self, text: str) -> str:
-        """テキストからステータスを抽出
+    def _split_entry_text(self, text: str) -> tuple[str, str, str]:
+        """テキストを日付・ステータス・残りの部分に分解
 
         Args:
             text: エントリーのテキスト
 
         Returns:
-            ステータス文字列（終了/復旧/完了等）、なければ空文字
+            (日付, ステータス, 残りのテキスト) のタプル
+            日付・ステータスがなければ空文字
         """
-        # 日付の後に続く括弧内のステータスを探す
-        # 例: "2025.12.09（終了）緊急メンテナンス..."
-        status_match = re.search(
-            r"(?:\d{4}\.\d{2}\.\d{2})?\s*[（(]([^）)]+)[）)]", text
-        )
+        date_match = _RE_DATE.search(text)
+        date = date_match.group(0) if date_match else ""
+
+        status = ""
+        bracket_match = _RE_BRACKET.search(text)
+        if bracket_match and not _RE_AREA_WORD.search(bracket_match.group(1)):
+            status = bracket_match.group(1)
 
-        if status_match:
-            status = status_match.group(1)
-            # 地域情報（丁目、付近など）ではないことを確認
-            if not re.search(r"丁目|付近|地区|町|番地", status):
-                return status
+        # 日付とステータスの括弧（同じものが複数あればすべて）を除去した残り
+        rest = text.replace(date, "") if date else text
+        if status:
+            rest = _RE_BRACKET.sub(
+                lambda m: "" if m.group(1) == status else m.group(0), rest
+            )
 
-        return ""
+        return date, status, rest.strip()
 
-    def _extract_title_and_area(
-        self, text: str, date: str, status: str
-    ) -> tuple[str, str]:
-        """テキストからタイトルと地域を抽出
+    def _extract_title_and_area(self, text: str) -> tuple[str, str]:
+        """日付・ステータスを除いたテキストからタイトルと地域を抽出
 
         Args:
-            text: エントリーのテキスト
-            date: 日付文字列
-            status: ステータス文字列
+            text: 日付・ステータスを除いたエントリーのテキスト
 
         Returns:
             (タイトル, 地域) のタプル
         """
-        # 日付とステータスを除去
-        clean_text = text
-
-        if date:
-            clean_text = clean_text.replace(date, "")
-
-        if status:
-            # ステータス部分（括弧込み）を除去
-            clean_text = re.sub(rf"[（(]{re.escape(status)}[）)]", "", clean_text)
-
-        clean_text = clean_text.strip()
-
         # 地域情報を抽出（括弧内で「丁目」「付近」などを含むもの）
-        area_match = re.search(
-            r"[（(]([^）)]*(?:丁目|付近|地区|町|番地)[^）)]*)[）)]", clean_text
-        )
-        area = area_match.group(1) if area_match else ""
-
-        # タイトルを抽出（地域情報を除去）
-        title = clean_text
-        if area:
-            title = re.sub(rf"[（(]{re.escape(area)}[）)]", "", title)
+        area_match = _RE_AREA.search(text)
+        if not area_match:
+            return text.strip(), ""
 
-        title = title.strip()
+        # タイトルを抽出（地域情報を括弧ごと除去）
+        title = text.replace(area_match.group(0), "").strip()
 
-        return title, area
+        return title, area_match.group(1)
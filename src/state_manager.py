@@ -1,18 +1,46 @@
 """状態管理モジュール"""
 
-import json
 import logging
+import os
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 
-from .config import STATE_FILE_PATH
+import orjson
+
+from .config import MONTHLY_TWEET_LIMIT, STATE_FILE_PATH
 from .scraper import OutageInfo
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# 変更検出に使うフィールド（OutageInfo の属性と保存エントリーのキーで共通）
+_FINGERPRINT_FIELDS = ("date", "status", "title", "area", "url")
+
+# 辞書に存在しないことを表す番兵
+_MISSING = object()
+
+# 障害間で同じ値が繰り返し現れるため、インターンして共有するフィールド
+_INTERNED_FIELDS = ("date", "status", "area")
+
+
+def _month_key(now: datetime) -> str:
+    """月間カウンター用の月キー（YYYY-MM形式）を取得
+
+    Args:
+        now: 基準日時
+
+    Returns:
+        月キー
+    """
+    # strftime は書式文字列を毎回解釈するため、整数の書式指定で組み立てる
+    return f"{now.year:04d}-{now.month:02d}"
+
+
+@dataclass(slots=True, frozen=True)
 class StatusChange:
     """ステータス変更情報"""
 
@@ -21,7 +49,7 @@ class StatusChange:
     new_status: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChangeResult:
     """差分検出結果"""
 
@@ -53,8 +81,43 @@ class StateManager:
             state_file: 状態ファイルのパス（デフォルト: data/state.json）
         """
         self.state_file = state_file or STATE_FILE_PATH
+        # 1回の実行は短時間で終わるため、当月キーは初期化時に一度だけ求める
+        self._current_month = _month_key(datetime.now(UTC))
         self.state = self._load_state()
         self._dirty = False
+        self._in_transaction = False
+        self._force_on_commit = False
+
+        # 頻繁に参照する辞書は直接保持する（読み込んだ状態に無ければ補う）
+        self._outages: dict[str, dict] = self.state.setdefault("outages", {})
+        self._stats: dict = self.state.setdefault(
+            "stats",
+            {"total_notifications_this_month": 0, "month": self._current_month},
+        )
+        # 古い状態ファイルでカウンターが欠けていても直接加算できるようにする
+        self._stats.setdefault("total_notifications_this_month", 0)
+
+        # 繰り返し現れる文字列は1つのオブジェクトに寄せる（比較も同一性で済む）
+        for entry in self._outages.values():
+            for field in _INTERNED_FIELDS:
+                if isinstance(value := entry.get(field), str):
+                    entry[field] = sys.intern(value)
+
+        # 通知済みステータスの判定用インデックス（ファイル上はリストのまま保持）
+        self._notified_sets: dict[str, set[str]] = {
+            outage_id: set(entry.get("notified_statuses", []))
+            for outage_id, entry in self._outages.items()
+        }
+        # 変更検出用のフィンガープリント（メモリ上のみで保持し、永続化しない）
+        self._fingerprints: dict[str, tuple] = {
+            outage_id: tuple(entry.get(field) for field in _FINGERPRINT_FIELDS)
+            for outage_id, entry in self._outages.items()
+        }
+        # 差分検出で参照するステータスだけを障害IDから直接引けるようにする
+        self._status_by_id: dict[str, str] = {
+            outage_id: entry.get("status", "")
+            for outage_id, entry in self._outages.items()
+        }
 
     def _load_state(self) -> dict:
         """状態ファイルを読み込む
@@ -63,20 +126,23 @@ class StateManager:
             状態辞書
         """
         if not self.state_file.exists():
-            logger.info(f"状態ファイルが存在しません: {self.state_file}")
+            logger.info("状態ファイルが存在しません: %s", self.state_file)
             return self._create_initial_state()
 
         try:
-            with open(self.state_file, encoding="utf-8") as f:
-                state = json.load(f)
-                logger.info(
-                    f"状態ファイルを読み込みました: {len(state.get('outages', {}))} 件の障害情報"
-                )
-                return state
-        except (OSError, json.JSONDecodeError) as e:
-            logger.error(f"状態ファイルの読み込みに失敗: {e}")
+            # バイト列のままorjsonに渡し、テキストとしてのデコードを省く
+            # （1回読み切るだけなのでmmapは使わない）
+            state = orjson.loads(self.state_file.read_bytes())
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.error("状態ファイルの読み込みに失敗: %s", e)
             return self._create_initial_state()
 
+        logger.info(
+            "状態ファイルを読み込みました: %s 件の障害情報",
+            len(state.get("outages", {})),
+        )
+        return state
+
     def _create_initial_state(self) -> dict:
         """初期状態を作成
 
@@ -88,7 +154,7 @@ class StateManager:
             "outages": {},
             "stats": {
                 "total_notifications_this_month": 0,
-                "month": datetime.now(UTC).strftime("%Y-%m"),
+                "month": self._current_month,
             },
         }
 
@@ -101,6 +167,12 @@ class StateManager:
         Returns:
             実際に保存した場合True、スキップした場合False
         """
+        if self._in_transaction:
+            # 強制保存の要求は終了時の保存に引き継ぐ
+            self._force_on_commit = self._force_on_commit or force
+            logger.debug("トランザクション中のため保存を終了時まで延期します")
+            return False
+
         if not force and not self._dirty:
             logger.debug("状態に変更がないため保存をスキップします")
             return False
@@ -108,15 +180,80 @@ class StateManager:
         # ディレクトリが存在しない場合は作成
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
 
+        # 書き込み途中で中断されても状態ファイルが壊れないよう、
+        # 一時ファイルに書き出してfsyncしてから置き換える
+        tmp_file = self.state_file.with_name(f"{self.state_file.name}.tmp")
+        # 人が直接読むことはないため、インデントなしのコンパクト形式で書き出す
+        data = orjson.dumps(self.state)
+
         try:
-            with open(self.state_file, "w", encoding="utf-8") as f:
-                json.dump(self.state, f, ensure_ascii=False, indent=2)
-            logger.info(f"状態ファイルを保存しました: {self.state_file}")
+            self._write_file_synced(tmp_file, data)
+            os.replace(tmp_file, self.state_file)
+            logger.info("状態ファイルを保存しました: %s", self.state_file)
             self._dirty = False
             return True
         except OSError as e:
-            logger.error(f"状態ファイルの保存に失敗: {e}")
+            logger.error("状態ファイルの保存に失敗: %s", e)
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """複数の変更をまとめて1回の保存にするコンテキストマネージャ
+
+        ブロック内の save_state() 呼び出しは延期され、終了時に変更があれば
+        （ブロック内で強制保存が要求された場合は必ず）1度だけ保存する。
+        入れ子で使った場合は最も外側でのみ保存する。
+
+        ブロック内で例外が発生した場合も、送信済みの通知を記録するため保存を
+        試みる。その保存に失敗してもログに残すだけにし、元の例外を送出する。
+        """
+        if self._in_transaction:
+            yield
+            return
+
+        self._in_transaction = True
+        self._force_on_commit = False
+        try:
+            yield
+        except BaseException:
+            try:
+                self._commit_transaction()
+            except OSError:
+                logger.exception("トランザクション終了時の保存に失敗しました")
             raise
+        self._commit_transaction()
+
+    def _commit_transaction(self) -> bool:
+        """トランザクションを終了し、延期していた保存を行う
+
+        Returns:
+            実際に保存した場合True、スキップした場合False
+        """
+        force = self._force_on_commit
+        self._in_transaction = False
+        self._force_on_commit = False
+        return self.save_state(force=force)
+
+    def _write_file_synced(self, path: Path, data: bytes) -> None:
+        """バイト列をファイルに書き込みfsyncする
+
+        シリアライズ済みのバイト列を書くだけなので、バッファ付きファイル
+        オブジェクトを介さずファイルディスクリプタへ直接書き込む
+
+        Args:
+            path: 書き込み先のパス
+            data: 書き込むバイト列
+        """
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
 
     def get_changes(self, current_outages: list[OutageInfo]) -> ChangeResult:
         """新規障害とステータス変更を検出
@@ -127,38 +264,46 @@ class StateManager:
         Returns:
             ChangeResult オブジェクト
         """
-        new_outages = []
-        status_changes = []
-        stored_outages = self.state.get("outages", {})
+        status_by_id = self._status_by_id
+        # ログが出力されない場合はログ用のループや引数の評価自体を省略する
+        log_info = logger.isEnabledFor(logging.INFO)
 
-        for outage in current_outages:
-            if outage.id not in stored_outages:
-                # 新規障害
-                new_outages.append(outage)
-                logger.info(f"新規障害を検出: ID={outage.id}, タイトル={outage.title}")
+        # 新規障害は保存済みIDとの差集合で判定（通知順は取得順を維持）
+        new_ids = {outage.id for outage in current_outages}.difference(status_by_id)
+        new_outages = [outage for outage in current_outages if outage.id in new_ids]
 
-            else:
-                # 既存障害のステータス変更チェック
-                stored = stored_outages[outage.id]
-                old_status = stored.get("status", "")
-                new_status = outage.status
-
-                # ステータスが変更された場合
-                if old_status != new_status:
-                    # 既に通知済みのステータスかチェック
-                    notified_statuses = stored.get("notified_statuses", [])
-                    if new_status not in notified_statuses:
-                        status_changes.append(
-                            StatusChange(
-                                outage=outage,
-                                old_status=old_status,
-                                new_status=new_status,
-                            )
-                        )
-                        logger.info(
-                            f"ステータス変更を検出: ID={outage.id}, "
-                            f"{old_status or '(進行中)'} -> {new_status or '(進行中)'}"
-                        )
+        if log_info:
+            for outage in new_outages:
+                logger.info(
+                    "新規障害を検出: ID=%s, タイトル=%s", outage.id, outage.title
+                )
+
+        # 既存障害のステータス変更チェック
+        status_changes = []
+        for outage in current_outages:
+            old_status = status_by_id.get(outage.id, _MISSING)
+            new_status = outage.status
+
+            # 新規障害は対象外。ステータスが変更され、かつ未通知の場合のみ
+            if old_status is _MISSING or old_status == new_status:
+                continue
+            if new_status in self._notified_sets.get(outage.id, ()):
+                continue
+
+            status_changes.append(
+                StatusChange(
+                    outage=outage,
+                    old_status=old_status,
+                    new_status=new_status,
+                )
+            )
+            if log_info:
+                logger.info(
+                    "ステータス変更を検出: ID=%s, %s -> %s",
+                    outage.id,
+                    old_status or "(進行中)",
+                    new_status or "(進行中)",
+                )
 
         return ChangeResult(new_outages=new_outages, status_changes=status_changes)
 
@@ -169,38 +314,35 @@ class StateManager:
             outages: 最新の障害情報リスト
         """
         # 月のロールオーバーチェック
-        current_month = datetime.now(UTC).strftime("%Y-%m")
-        stats = self.state.get("stats", {})
-        if stats.get("month") != current_month:
-            logger.info(f"月が変わりました: {stats.get('month')} -> {current_month}")
-            stats["month"] = current_month
+        stats = self._stats
+        if stats.get("month") != self._current_month:
+            logger.info(
+                "月が変わりました: %s -> %s", stats.get("month"), self._current_month
+            )
+            stats["month"] = self._current_month
             stats["total_notifications_this_month"] = 0
-            self.state["stats"] = stats
             self._mark_dirty()
 
-        stored_outages = self.state.get("outages", {})
+        stored_outages = self._outages
         now = datetime.now(UTC).isoformat()
 
         for outage in outages:
+            date = sys.intern(outage.date)
+            status = sys.intern(outage.status)
+            area = sys.intern(outage.area)
+            new_fp = (date, status, outage.title, area, outage.url)
             if outage.id in stored_outages:
-                # 既存エントリー: フィールド変更をチェック
-                existing = stored_outages[outage.id]
-                changed = (
-                    existing.get("date") != outage.date
-                    or existing.get("status") != outage.status
-                    or existing.get("title") != outage.title
-                    or existing.get("area") != outage.area
-                    or existing.get("url") != outage.url
-                )
-
-                if changed:
+                # 既存エントリー: フィンガープリントの比較1回で変更をチェック
+                if self._fingerprints.get(outage.id) != new_fp:
                     self._mark_dirty()
-                    existing.update(
+                    self._fingerprints[outage.id] = new_fp
+                    self._status_by_id[outage.id] = status
+                    stored_outages[outage.id].update(
                         {
-                            "date": outage.date,
-                            "status": outage.status,
+                            "date": date,
+                            "status": status,
                             "title": outage.title,
-                            "area": outage.area,
+                            "area": area,
                             "url": outage.url,
                             "last_updated": now,
                         }
@@ -210,17 +352,18 @@ class StateManager:
                 self._mark_dirty()
                 stored_outages[outage.id] = {
                     "id": outage.id,
-                    "date": outage.date,
-                    "status": outage.status,
+                    "date": date,
+                    "status": status,
                     "title": outage.title,
-                    "area": outage.area,
+                    "area": area,
                     "url": outage.url,
                     "first_seen": now,
                     "last_updated": now,
                     "notified_statuses": [],
                 }
-
-        self.state["outages"] = stored_outages
+                self._notified_sets[outage.id] = set()
+                self._fingerprints[outage.id] = new_fp
+                self._status_by_id[outage.id] = status
 
     def mark_notified(self, outage_id: str, status: str) -> None:
         """ステータスを通知済みとしてマーク
@@ -229,29 +372,31 @@ class StateManager:
             outage_id: 障害ID
             status: 通知したステータス
         """
-        outages = self.state.get("outages", {})
-        if outage_id in outages:
-            notified = outages[outage_id].get("notified_statuses", [])
-            if status not in notified:
-                notified.append(status)
-                outages[outage_id]["notified_statuses"] = notified
-                self._mark_dirty()
-                logger.debug(f"通知済みマーク: ID={outage_id}, ステータス={status}")
+        entry = self._outages.get(outage_id)
+        if entry is None:
+            return
+
+        # 通知済みなら状態を変更しない（dirtyにもしない）
+        notified = self._notified_sets.setdefault(outage_id, set())
+        if status in notified:
+            return
+
+        notified.add(status)
+        # ファイル上のリストは通知順を保つため末尾に追加する
+        entry.setdefault("notified_statuses", []).append(status)
+        self._mark_dirty()
+        logger.debug("通知済みマーク: ID=%s, ステータス=%s", outage_id, status)
 
     def increment_notification_count(self) -> None:
         """月間通知カウントをインクリメント"""
-        current_month = datetime.now(UTC).strftime("%Y-%m")
-        stats = self.state.get("stats", {})
+        stats = self._stats
 
         # 月が変わった場合はカウントをリセット
-        if stats.get("month") != current_month:
-            stats["month"] = current_month
+        if stats.get("month") != self._current_month:
+            stats["month"] = self._current_month
             stats["total_notifications_this_month"] = 0
 
-        stats["total_notifications_this_month"] = (
-            stats.get("total_notifications_this_month", 0) + 1
-        )
-        self.state["stats"] = stats
+        stats["total_notifications_this_month"] += 1
         self._mark_dirty()
 
     def get_notification_count_this_month(self) -> int:
@@ -260,14 +405,32 @@ class StateManager:
         Returns:
             今月の通知数
         """
-        current_month = datetime.now(UTC).strftime("%Y-%m")
-        stats = self.state.get("stats", {})
+        stats = self._stats
 
         # 月が変わっていればカウントは0
-        if stats.get("month") != current_month:
+        if stats.get("month") != self._current_month:
             return 0
 
-        return stats.get("total_notifications_this_month", 0)
+        return stats["total_notifications_this_month"]
+
+    def get_remaining_quota(self) -> int:
+        """今月の残り投稿可能数を取得
+
+        Returns:
+            月間投稿上限までの残り件数（上限到達時は0）
+        """
+        return max(0, MONTHLY_TWEET_LIMIT - self.get_notification_count_this_month())
+
+    def get_http_cache(self) -> dict:
+        """条件付きGET用のHTTPキャッシュを取得
+
+        返した辞書はスクレイパーが直接更新する。キャッシュの更新だけでは
+        dirtyにしないため、障害情報に変更があって保存するときに一緒に永続化される
+
+        Returns:
+            URLをキーとするキャッシュ辞書
+        """
+        return self.state.setdefault("http_cache", {})
 
     def is_dirty(self) -> bool:
         """状態に保存が必要な変更があるかチェック
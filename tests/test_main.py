@@ -0,0 +1,54 @@
+"""メイン処理のテスト"""
+
+import json
+
+from src.main import print_state_pretty
+from src.scraper import OutageInfo
+from src.state_manager import StateManager
+
+
+class TestPrintStatePretty:
+    """状態ファイル整形表示のテスト"""
+
+    def test_stdout_is_indented_json(self, tmp_path, capsys):
+        """標準出力にはインデント付きのJSONだけが出力されること"""
+        state_file = tmp_path / "state.json"
+        manager = StateManager(state_file)
+        manager.update_outages(
+            [
+                OutageInfo(
+                    id="100",
+                    date="2025.12.20",
+                    status="",
+                    title="テスト障害",
+                    area="",
+                    url="https://www.toshima.co.jp/trouble/detail/100",
+                )
+            ]
+        )
+        manager.save_state()
+
+        assert print_state_pretty(state_file) == 0
+
+        out = capsys.readouterr().out
+        assert '\n  "outages": {' in out
+        assert json.loads(out)["outages"]["100"]["title"] == "テスト障害"
+
+    def test_missing_state_file(self, tmp_path, capsys):
+        """状態ファイルがない場合はエラー終了し、何も出力しないこと"""
+        assert print_state_pretty(tmp_path / "missing.json") == 1
+
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "状態ファイルが見つかりません" in captured.err
+
+    def test_corrupt_state_file(self, tmp_path, capsys):
+        """状態ファイルが壊れている場合はエラー終了し、何も出力しないこと"""
+        state_file = tmp_path / "state.json"
+        state_file.write_text("{not json", encoding="utf-8")
+
+        assert print_state_pretty(state_file) == 1
+
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "状態ファイルを読み込めません" in captured.err
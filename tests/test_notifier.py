@@ -0,0 +1,205 @@
+"""通知のテスト"""
+
+from dataclasses import asdict
+
+import pytest
+
+from src.config import MONTHLY_TWEET_LIMIT
+from src.notifier import XNotifier, select_notifications
+from src.scraper import OutageInfo
+from src.state_manager import ChangeResult, StateManager, StatusChange
+
+
+@pytest.fixture
+def notifier(monkeypatch):
+    """X APIを呼ばない通知インスタンス"""
+    monkeypatch.setattr("src.notifier.DRY_RUN", True)
+    return XNotifier()
+
+
+def make_outage(outage_id: str, status: str = "") -> OutageInfo:
+    """テスト用の障害情報を作成"""
+    return OutageInfo(
+        id=outage_id,
+        date="2025.12.20",
+        status=status,
+        title=f"テスト障害{outage_id}",
+        area="池袋1丁目付近",
+        url=f"https://www.toshima.co.jp/trouble/detail/{outage_id}",
+    )
+
+
+class TestMessageFormat:
+    """メッセージフォーマットのテスト"""
+
+    def test_new_outage_message(self, notifier):
+        """新規障害メッセージに日時・地域・詳細URLが含まれること"""
+        message = notifier._format_new_outage_message(make_outage("1"))
+
+        assert message == (
+            "【としまテレビ 障害情報】\n"
+            "テスト障害1\n"
+            "日時: 2025.12.20\n"
+            "地域: 池袋1丁目付近\n"
+            "詳細: https://www.toshima.co.jp/trouble/detail/1"
+        )
+
+    def test_new_outage_message_skips_empty_fields(self, notifier):
+        """空の日時・地域は出力しないこと"""
+        outage = OutageInfo(
+            id="2", date="", status="", title="障害", area="", url="https://e.x/2"
+        )
+
+        message = notifier._format_new_outage_message(outage)
+
+        assert message == "【としまテレビ 障害情報】\n障害\n詳細: https://e.x/2"
+
+    def test_status_change_message_recovered(self, notifier):
+        """復旧時は復旧情報のヘッダーになること"""
+        change = StatusChange(
+            outage=make_outage("1", "復旧"), old_status="", new_status="復旧"
+        )
+
+        message = notifier._format_status_change_message(change)
+
+        assert message == (
+            "【としまテレビ 復旧情報】\n"
+            "テスト障害1 が復旧しました\n"
+            "地域: 池袋1丁目付近\n"
+            "詳細: https://www.toshima.co.jp/trouble/detail/1"
+        )
+
+    def test_status_change_message_in_progress(self, notifier):
+        """終了系以外のステータスは障害情報更新のヘッダーになること"""
+        change = StatusChange(
+            outage=make_outage("1", "調査中"), old_status="", new_status="調査中"
+        )
+
+        message = notifier._format_status_change_message(change)
+
+        assert message.startswith(
+            "【としまテレビ 障害情報更新】\nテスト障害1（調査中）\n"
+        )
+
+    def test_long_message_truncated(self, notifier):
+        """最大文字数を超える場合は切り詰めること"""
+        outage = make_outage("1")
+        outage = OutageInfo(**{**asdict(outage), "title": "あ" * 300})
+
+        message = notifier._format_new_outage_message(outage)
+
+        assert len(message) == XNotifier.MAX_TWEET_LENGTH
+        assert message.endswith("...")
+
+
+class TestBatchNotification:
+    """まとめて通知のテスト"""
+
+    def test_results_keep_input_order(self, notifier, monkeypatch):
+        """投稿結果が引数と同じ順序で返ること"""
+        monkeypatch.setattr(
+            notifier, "_post_tweet", lambda message: "テスト障害2" not in message
+        )
+        outages = [make_outage(str(i)) for i in range(1, 6)]
+
+        results = notifier.notify_new_outages(outages)
+
+        assert results == [True, False, True, True, True]
+
+    def test_unexpected_error_fails_only_that_post(self, notifier, monkeypatch):
+        """想定外の例外は該当の投稿だけ失敗とし、投稿は障害の順に行われること"""
+        posted = []
+
+        class FakeClient:
+            def create_tweet(self, text):
+                if "テスト障害2" in text:
+                    raise RuntimeError("connection reset")
+                posted.append(text)
+                return type("Response", (), {"data": {"id": "1"}})()
+
+        monkeypatch.setattr("src.notifier.DRY_RUN", False)
+        notifier.client = FakeClient()
+        outages = [make_outage(str(i)) for i in range(1, 4)]
+
+        results = notifier.notify_new_outages(outages)
+
+        assert results == [True, False, True]
+        assert len(posted) == 2
+        assert "テスト障害1" in posted[0]
+        assert "テスト障害3" in posted[1]
+
+    def test_status_changes_posted(self, notifier):
+        """ステータス変更をまとめて通知できること"""
+        changes = [
+            StatusChange(
+                outage=make_outage("1", "復旧"), old_status="", new_status="復旧"
+            )
+        ]
+
+        assert notifier.notify_status_changes(changes) == [True]
+
+    def test_empty_batch(self, notifier):
+        """通知対象がない場合は空リストを返すこと"""
+        assert notifier.notify_new_outages([]) == []
+
+
+class TestSelectNotifications:
+    """通知対象選択のテスト"""
+
+    @pytest.fixture
+    def changes(self):
+        """新規障害2件・ステータス変更2件の差分"""
+        return ChangeResult(
+            new_outages=[make_outage("1"), make_outage("2")],
+            status_changes=[
+                StatusChange(
+                    make_outage("3", "復旧"), old_status="", new_status="復旧"
+                ),
+                StatusChange(
+                    make_outage("4", "終了"), old_status="", new_status="終了"
+                ),
+            ],
+        )
+
+    def make_manager(self, tmp_path, count: int) -> StateManager:
+        """今月の通知数を設定した状態管理オブジェクトを作成"""
+        manager = StateManager(tmp_path / "state.json")
+        manager.state["stats"]["total_notifications_this_month"] = count
+        return manager
+
+    def test_all_selected_with_enough_quota(self, tmp_path, changes):
+        """余裕がある場合はすべて通知対象になること"""
+        manager = self.make_manager(tmp_path, 0)
+
+        new, status = select_notifications(manager, changes)
+
+        assert len(new) == 2
+        assert len(status) == 2
+
+    def test_status_changes_stop_at_threshold(self, tmp_path, changes):
+        """新規障害の通知後に90%へ達する分のステータス変更は除外されること"""
+        threshold = int(MONTHLY_TWEET_LIMIT * 0.90)
+        manager = self.make_manager(tmp_path, threshold - 3)
+
+        new, status = select_notifications(manager, changes)
+
+        assert len(new) == 2
+        assert [c.outage.id for c in status] == ["3"]
+
+    def test_only_new_outages_above_threshold(self, tmp_path, changes):
+        """90%以上使用時は新規障害のみ通知対象になること"""
+        manager = self.make_manager(tmp_path, int(MONTHLY_TWEET_LIMIT * 0.96))
+
+        new, status = select_notifications(manager, changes)
+
+        assert len(new) == 2
+        assert status == []
+
+    def test_new_outages_capped_by_remaining_quota(self, tmp_path, changes):
+        """新規障害は残り投稿可能数までに制限されること"""
+        manager = self.make_manager(tmp_path, MONTHLY_TWEET_LIMIT - 1)
+
+        new, status = select_notifications(manager, changes)
+
+        assert [o.id for o in new] == ["1"]
+        assert status == []
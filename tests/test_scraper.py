@@ -3,7 +3,10 @@
 from pathlib import Path
 
 import pytest
+import responses
+from responses import matchers
 
+from src.config import MAX_RETRIES, TOSHIMA_TROUBLE_URL
 from src.scraper import OutageInfo, ToshimaScraper
 
 
@@ -81,28 +84,253 @@ class TestToshimaScraper:
         assert outages[1].url == "https://www.toshima.co.jp/trouble/detail/90"
 
 
-class TestExtractStatus:
-    """ステータス抽出のテスト"""
+class TestFetchOutageList:
+    """障害情報一覧取得のテスト"""
 
-    def test_extract_status_with_date(self, scraper):
+    @responses.activate
+    def test_fetch_multiple_pages(self, scraper, sample_list_html):
+        """複数ページの障害情報がページ順に結合されること"""
+        responses.get(TOSHIMA_TROUBLE_URL, body=sample_list_html)
+        responses.get(f"{TOSHIMA_TROUBLE_URL}page/2/", body=sample_list_html)
+
+        outages = scraper.fetch_outage_list(max_pages=2)
+
+        assert len(outages) == 8
+        assert [o.id for o in outages[:4]] == ["91", "90", "89", "88"]
+
+    @responses.activate
+    def test_fetch_stops_at_empty_page(self, scraper, sample_list_html):
+        """障害情報のないページ以降は結果に含めないこと"""
+        responses.get(TOSHIMA_TROUBLE_URL, body=sample_list_html)
+        responses.get(f"{TOSHIMA_TROUBLE_URL}page/2/", body="<html></html>")
+        responses.get(f"{TOSHIMA_TROUBLE_URL}page/3/", body=sample_list_html)
+
+        outages = scraper.fetch_outage_list(max_pages=3)
+
+        assert len(outages) == 4
+
+    @responses.activate
+    def test_fetch_more_pages_than_workers(
+        self, scraper, sample_list_html, monkeypatch
+    ):
+        """同時取得数の上限を超えるページ数でもページ順に結合されること"""
+        monkeypatch.setattr(scraper, "MAX_CONCURRENT_PAGES", 1)
+        responses.get(TOSHIMA_TROUBLE_URL, body=sample_list_html)
+        responses.get(f"{TOSHIMA_TROUBLE_URL}page/2/", body=sample_list_html)
+        responses.get(f"{TOSHIMA_TROUBLE_URL}page/3/", body="<html></html>")
+
+        outages = scraper.fetch_outage_list(max_pages=3)
+
+        assert len(outages) == 8
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_fetch_with_no_pages(self, scraper):
+        """取得ページ数が0以下の場合はリクエストせず空リストを返すこと"""
+        assert scraper.fetch_outage_list(max_pages=0) == []
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_fetch_decodes_as_utf8_without_charset(self, scraper, sample_list_html):
+        """Content-Typeにcharsetがない場合はUTF-8としてデコードすること"""
+        responses.get(
+            TOSHIMA_TROUBLE_URL,
+            body=sample_list_html.encode("utf-8"),
+            content_type="text/html",
+        )
+
+        outages = scraper.fetch_outage_list(max_pages=1)
+
+        assert outages[0].status == "終了"
+        assert "緊急メンテナンス" in outages[0].title
+
+    @responses.activate
+    def test_fetch_retries_on_server_error(self, scraper, sample_list_html):
+        """5xxエラーの後にリトライして取得できること"""
+        responses.get(TOSHIMA_TROUBLE_URL, status=503)
+        responses.get(TOSHIMA_TROUBLE_URL, body=sample_list_html)
+
+        outages = scraper.fetch_outage_list()
+
+        assert len(outages) == 4
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_fetch_gives_up_after_max_retries(self, scraper, monkeypatch):
+        """初回を含めてMAX_RETRIES回試行しても失敗した場合は取得をあきらめること"""
+        monkeypatch.setattr("urllib3.util.retry.time.sleep", lambda _: None)
+        responses.get(TOSHIMA_TROUBLE_URL, status=503)
+
+        outages = scraper.fetch_outage_list()
+
+        assert outages == []
+        assert len(responses.calls) == MAX_RETRIES
+
+    @responses.activate
+    def test_fetch_decodes_declared_charset(self, scraper, sample_list_html):
+        """UTF-8以外のcharsetが指定された場合はその文字コードでデコードすること"""
+        responses.get(
+            TOSHIMA_TROUBLE_URL,
+            body=sample_list_html.encode("shift_jis"),
+            content_type="text/html; charset=Shift_JIS",
+        )
+
+        outages = scraper.fetch_outage_list(max_pages=1)
+
+        assert outages[0].status == "終了"
+        assert "緊急メンテナンス" in outages[0].title
+
+    @responses.activate
+    def test_fetch_tolerates_unknown_charset(self, scraper, sample_list_html):
+        """不明なcharsetが指定されても例外にせずパースを続けること"""
+        responses.get(
+            TOSHIMA_TROUBLE_URL,
+            body=sample_list_html.encode("utf-8"),
+            content_type="text/html; charset=x-bogus-charset",
+        )
+
+        outages = scraper.fetch_outage_list(max_pages=1)
+
+        assert [o.id for o in outages] == ["91", "90", "89", "88"]
+
+
+class TestConditionalGet:
+    """条件付きGETのテスト"""
+
+    @responses.activate
+    def test_reuse_cached_outages_on_not_modified(self, sample_list_html):
+        """304レスポンスではキャッシュ済みのパース結果を返すこと"""
+        http_cache = {}
+        responses.get(
+            TOSHIMA_TROUBLE_URL,
+            body=sample_list_html,
+            headers={"ETag": '"v1"'},
+        )
+        first = ToshimaScraper(http_cache=http_cache).fetch_outage_list()
+
+        assert http_cache[TOSHIMA_TROUBLE_URL]["etag"] == '"v1"'
+
+        responses.replace(
+            responses.GET,
+            TOSHIMA_TROUBLE_URL,
+            status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+        )
+        second = ToshimaScraper(http_cache=http_cache).fetch_outage_list()
+
+        assert [o.id for o in second] == [o.id for o in first]
+        assert second[0].title == first[0].title
+
+    @responses.activate
+    def test_skip_parse_when_body_unchanged(
+        self, scraper, sample_list_html, monkeypatch
+    ):
+        """ETagがなくても本文が前回と同一ならパースを省略すること"""
+        responses.get(TOSHIMA_TROUBLE_URL, body=sample_list_html)
+        first = scraper.fetch_outage_list()
+
+        assert "body_hash" in scraper.http_cache[TOSHIMA_TROUBLE_URL]
+
+        def fail_parse(html):
+            raise AssertionError("パースが実行された")
+
+        monkeypatch.setattr(scraper, "_parse_list_page", fail_parse)
+        second = scraper.fetch_outage_list()
+
+        assert [o.id for o in second] == [o.id for o in first]
+
+    @responses.activate
+    def test_ignore_cache_from_other_parser_version(self, sample_list_html):
+        """別の版のパーサーで作られたキャッシュは使わず、条件なしで取得し直すこと"""
+        http_cache = {
+            TOSHIMA_TROUBLE_URL: {
+                "parser_version": "old",
+                "etag": '"v1"',
+                "outages": [],
+            }
+        }
+        responses.get(TOSHIMA_TROUBLE_URL, body=sample_list_html)
+
+        outages = ToshimaScraper(http_cache=http_cache).fetch_outage_list()
+
+        assert len(outages) == 4
+        assert "If-None-Match" not in responses.calls[0].request.headers
+        assert http_cache[TOSHIMA_TROUBLE_URL]["outages"] != []
+
+    @responses.activate
+    def test_reparse_when_cached_outages_are_broken(self, sample_list_html):
+        """キャッシュのパース結果を復元できない場合は取得し直してパースすること"""
+        http_cache = {}
+        responses.get(
+            TOSHIMA_TROUBLE_URL, body=sample_list_html, headers={"ETag": '"v1"'}
+        )
+        ToshimaScraper(http_cache=http_cache).fetch_outage_list()
+        http_cache[TOSHIMA_TROUBLE_URL]["outages"] = [{"id": "1", "unknown": "x"}]
+
+        responses.replace(
+            responses.GET,
+            TOSHIMA_TROUBLE_URL,
+            status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+        )
+        responses.get(TOSHIMA_TROUBLE_URL, body=sample_list_html)
+
+        outages = ToshimaScraper(http_cache=http_cache).fetch_outage_list()
+
+        assert [o.id for o in outages] == ["91", "90", "89", "88"]
+        assert len(responses.calls) == 3
+        assert "If-None-Match" not in responses.calls[2].request.headers
+
+
+class TestSplitEntryText:
+    """日付・ステータス分解のテスト"""
+
+    def test_split_with_date_and_status(self, scraper):
         """日付付きテキストからステータスを抽出"""
         text = "2025.12.09（終了）緊急メンテナンス"
-        assert scraper._extract_status(text) == "終了"
+        assert scraper._split_entry_text(text) == (
+            "2025.12.09",
+            "終了",
+            "緊急メンテナンス",
+        )
 
-    def test_extract_status_restoration(self, scraper):
+    def test_split_restoration(self, scraper):
         """復旧ステータスを抽出"""
         text = "2025.12.05（復旧）インターネット接続障害"
-        assert scraper._extract_status(text) == "復旧"
+        assert scraper._split_entry_text(text)[1] == "復旧"
 
-    def test_extract_status_no_status(self, scraper):
+    def test_split_no_status(self, scraper):
         """ステータスがない場合は空文字"""
         text = "2025.12.01インターネットサービス不通"
-        assert scraper._extract_status(text) == ""
-
-    def test_extract_status_ignores_area(self, scraper):
+        assert scraper._split_entry_text(text) == (
+            "2025.12.01",
+            "",
+            "インターネットサービス不通",
+        )
+
+    def test_split_status_after_title_without_date(self, scraper):
+        """日付がなくてもタイトルの後ろの括弧をステータスとして抽出"""
+        text = "緊急メンテナンス（調査中）"
+        assert scraper._split_entry_text(text) == ("", "調査中", "緊急メンテナンス")
+
+    def test_split_date_after_prefix(self, scraper):
+        """前置きの後ろにある日付も抽出し、残りのテキストから除去する"""
+        text = "【重要】2025.12.09（終了）障害"
+        assert scraper._split_entry_text(text) == ("2025.12.09", "終了", "【重要】障害")
+
+    def test_split_removes_repeated_status(self, scraper):
+        """同じステータスの括弧が複数あればすべて除去する"""
+        text = "2025.12.09（終了）障害（終了）"
+        assert scraper._split_entry_text(text) == ("2025.12.09", "終了", "障害")
+
+    def test_split_ignores_area(self, scraper):
         """地域情報をステータスとして誤認しない"""
         text = "2025.12.01（池袋1丁目付近）障害発生"
-        assert scraper._extract_status(text) == ""
+        assert scraper._split_entry_text(text) == (
+            "2025.12.01",
+            "",
+            "（池袋1丁目付近）障害発生",
+        )
 
 
 class TestExtractTitleAndArea:
@@ -111,7 +339,7 @@ class TestExtractTitleAndArea:
     def test_extract_title_and_area_with_both(self, scraper):
         """タイトルと地域の両方がある場合"""
         text = "緊急メンテナンス（池袋本町1丁目付近）"
-        title, area = scraper._extract_title_and_area(text, "", "")
+        title, area = scraper._extract_title_and_area(text)
 
         assert "緊急メンテナンス" in title
         assert "池袋本町1丁目" in area
@@ -119,7 +347,7 @@ class TestExtractTitleAndArea:
     def test_extract_title_and_area_no_area(self, scraper):
         """地域情報がない場合"""
         text = "定期メンテナンス"
-        title, area = scraper._extract_title_and_area(text, "", "")
+        title, area = scraper._extract_title_and_area(text)
 
         assert "定期メンテナンス" in title
         assert area == ""
@@ -1,7 +1,10 @@
 """状態管理のテスト"""
 
+from dataclasses import replace
+
 import pytest
 
+from src.config import MONTHLY_TWEET_LIMIT
 from src.scraper import OutageInfo
 from src.state_manager import ChangeResult, StateManager, StatusChange
 
@@ -64,6 +67,70 @@ class TestStateManager:
         assert "100" in manager2.state["outages"]
         assert manager2.state["outages"]["100"]["title"] == "テスト障害"
 
+    def test_save_state_leaves_no_temp_file(self, temp_state_file, sample_outage):
+        """保存後に一時ファイルが残らないこと"""
+        manager = StateManager(temp_state_file)
+        manager.update_outages([sample_outage])
+        manager.save_state()
+
+        assert temp_state_file.exists()
+        assert list(temp_state_file.parent.glob("*.tmp")) == []
+
+    def test_failed_save_keeps_previous_state(
+        self, temp_state_file, sample_outage, monkeypatch
+    ):
+        """保存に失敗しても既存の状態ファイルは壊れず一時ファイルも残らないこと"""
+        manager = StateManager(temp_state_file)
+        manager.save_state(force=True)
+        previous = temp_state_file.read_bytes()
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("src.state_manager.os.replace", fail_replace)
+        manager.update_outages([sample_outage])
+
+        with pytest.raises(OSError):
+            manager.save_state()
+
+        assert temp_state_file.read_bytes() == previous
+        assert list(temp_state_file.parent.glob("*.tmp")) == []
+        assert manager.is_dirty()
+
+    def test_save_state_writes_compact_json(self, temp_state_file, sample_outage):
+        """状態ファイルがインデントなしのコンパクト形式で保存されること"""
+        manager = StateManager(temp_state_file)
+        manager.update_outages([sample_outage])
+        manager.save_state()
+
+        assert b"\n" not in temp_state_file.read_bytes()
+
+    def test_http_cache_persisted_with_state(self, temp_state_file, sample_outage):
+        """HTTPキャッシュが状態と一緒に保存されること"""
+        manager = StateManager(temp_state_file)
+        manager.get_http_cache()["https://example.com/"] = {"etag": '"v1"'}
+
+        assert not manager.is_dirty()  # キャッシュ更新だけではdirtyにならない
+
+        manager.update_outages([sample_outage])
+        manager.save_state()
+
+        manager2 = StateManager(temp_state_file)
+        assert manager2.get_http_cache() == {"https://example.com/": {"etag": '"v1"'}}
+
+    def test_repeated_strings_shared_after_load(
+        self, temp_state_file, sample_outage_with_status
+    ):
+        """読み込み後、同じステータスや地域の文字列が共有されること"""
+        manager = StateManager(temp_state_file)
+        other = replace(sample_outage_with_status, id="101")
+        manager.update_outages([sample_outage_with_status, other])
+        manager.save_state()
+
+        outages = StateManager(temp_state_file).state["outages"]
+        assert outages["100"]["status"] is outages["101"]["status"]
+        assert outages["100"]["area"] is outages["101"]["area"]
+
 
 class TestGetChanges:
     """差分検出のテスト"""
@@ -119,6 +186,21 @@ class TestGetChanges:
 
         assert len(changes.status_changes) == 0
 
+    def test_notified_statuses_survive_reload(
+        self, temp_state_file, sample_outage, sample_outage_with_status
+    ):
+        """再読み込み後も通知済みステータスは重複通知されないこと"""
+        manager = StateManager(temp_state_file)
+        manager.update_outages([sample_outage])
+        manager.mark_notified("100", "")
+        manager.mark_notified("100", "復旧")
+        manager.save_state()
+
+        manager2 = StateManager(temp_state_file)
+        changes = manager2.get_changes([sample_outage_with_status])
+
+        assert len(changes.status_changes) == 0
+
 
 class TestMarkNotified:
     """通知済みマークのテスト"""
@@ -156,6 +238,19 @@ class TestNotificationCount:
         manager.increment_notification_count()
         assert manager.get_notification_count_this_month() == 2
 
+    def test_remaining_quota(self, temp_state_file):
+        """残り投稿可能数が上限から通知数を引いた値になること"""
+        manager = StateManager(temp_state_file)
+        assert manager.get_remaining_quota() == MONTHLY_TWEET_LIMIT
+
+        manager.increment_notification_count()
+        assert manager.get_remaining_quota() == MONTHLY_TWEET_LIMIT - 1
+
+        manager.state["stats"]["total_notifications_this_month"] = (
+            MONTHLY_TWEET_LIMIT + 5
+        )
+        assert manager.get_remaining_quota() == 0
+
 
 class TestDirtyFlag:
     """Dirty Flagのテスト"""
@@ -236,6 +331,20 @@ class TestDirtyFlag:
         manager2.update_outages([outage])
         assert not manager2.is_dirty()
 
+    def test_fingerprint_follows_updates(self, temp_state_file, sample_outage):
+        """更新後の内容で再度更新してもdirtyフラグが立たない"""
+        manager = StateManager(temp_state_file)
+        manager.update_outages([sample_outage])
+        manager.save_state()
+
+        updated = replace(sample_outage, status="復旧")
+        manager.update_outages([updated])
+        assert manager.is_dirty()
+        manager.save_state()
+
+        manager.update_outages([updated])
+        assert not manager.is_dirty()
+
     def test_save_state_only_when_dirty(self, temp_state_file):
         """dirtyフラグがFalseの時は保存をスキップ"""
         manager = StateManager(temp_state_file)
@@ -255,6 +364,57 @@ class TestDirtyFlag:
         assert not manager.is_dirty()
         assert manager.save_state(force=True)
 
+    def test_transaction_saves_once_on_exit(self, temp_state_file, sample_outage):
+        """トランザクション内の保存は延期され、終了時に1度だけ保存される"""
+        manager = StateManager(temp_state_file)
+
+        with manager.transaction():
+            manager.update_outages([sample_outage])
+            assert not manager.save_state()
+            manager.mark_notified("100", "")
+            manager.increment_notification_count()
+            assert not temp_state_file.exists()
+
+        assert not manager.is_dirty()
+        manager2 = StateManager(temp_state_file)
+        assert manager2.state["outages"]["100"]["notified_statuses"] == [""]
+        assert manager2.get_notification_count_this_month() == 1
+
+    def test_transaction_without_changes_skips_save(self, temp_state_file):
+        """変更がなければトランザクション終了時も保存しない"""
+        manager = StateManager(temp_state_file)
+
+        with manager.transaction():
+            pass
+
+        assert not temp_state_file.exists()
+
+    def test_transaction_keeps_forced_save(self, temp_state_file):
+        """トランザクション内の強制保存は終了時の保存に引き継がれる"""
+        manager = StateManager(temp_state_file)
+
+        with manager.transaction():
+            assert not manager.save_state(force=True)
+
+        assert temp_state_file.exists()
+
+    def test_transaction_failed_save_keeps_original_error(
+        self, temp_state_file, sample_outage, monkeypatch
+    ):
+        """例外時の保存に失敗しても、ブロック内の例外がそのまま送出される"""
+        manager = StateManager(temp_state_file)
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("src.state_manager.os.replace", fail_replace)
+
+        with pytest.raises(RuntimeError, match="boom"), manager.transaction():
+            manager.update_outages([sample_outage])
+            raise RuntimeError("boom")
+
+        assert manager.is_dirty()
+
     def test_dirty_flag_reset_after_save(self, temp_state_file):
         """保存後はdirtyフラグがクリアされる"""
         manager = StateManager(temp_state_file)
@@ -296,6 +456,17 @@ class TestDirtyFlag:
         manager2.mark_notified("1", "復旧")
         assert manager2.is_dirty()
 
+    def test_repeated_mark_notified_keeps_clean(self, temp_state_file, sample_outage):
+        """通知済みステータスや未知のIDへのマークではdirtyフラグが立たない"""
+        manager = StateManager(temp_state_file)
+        manager.update_outages([sample_outage])
+        manager.mark_notified("100", "")
+        manager.save_state()
+
+        manager.mark_notified("100", "")
+        manager.mark_notified("999", "")
+        assert not manager.is_dirty()
+
     def test_increment_notification_count_marks_dirty(self, temp_state_file):
         """increment_notification_count()でdirtyフラグが立つ"""
         manager = StateManager(temp_state_file)